@@ -0,0 +1,97 @@
+"""
+Numba-compiled backtracking search over labeled triangle-free graphs.
+
+Runs the same search as find_triangle_free._recursive_build (independent
+neighbor sets by size, then lexicographically) on an int64 bitmask array
+and checks Psi_k on every complete graph without returning to Python, so
+only the matching graphs are ever converted to Python objects.
+Requires numba; see NUMBA_AVAILABLE in psi_core.
+"""
+from psi_core import NUMBA_AVAILABLE
+
+if NUMBA_AVAILABLE:
+    import numpy as np
+    from numba import njit, types
+    from numba.typed import List
+    from psi_core import psi_k_core
+
+    # Indices into the stats array shared by the recursion
+    COUNT, FOUND, LIMIT = 0, 1, 2
+
+    # Not cached: numba's on-disk cache does not handle recursive functions
+    @njit(boundscheck=False)
+    def _build(adj, cur, N, k, candidates, size, chosen, stats, matches):
+        """
+        Picks `size` more neighbors of vertex cur from candidates (on top of
+        chosen), then adds cur and extends the graph up to N vertices.
+        Returns True if at least one independent set was completed.
+        """
+        if size == 0:
+            # Valid extension: add the new node, recurse, then undo
+            adj[cur] = chosen
+            for v in range(cur):
+                if (chosen >> v) & 1:
+                    adj[v] |= 1 << cur
+            if cur + 1 == N:
+                stats[COUNT] += 1
+                if psi_k_core(adj, N, k):
+                    matches.append(adj.copy())
+                    stats[FOUND] += 1
+            else:
+                all_prev = (1 << (cur + 1)) - 1
+                for r in range(cur + 2):
+                    if not _build(adj, cur + 1, N, k, all_prev, r, 0, stats, matches):
+                        # No independent set of size r means none of any larger size either
+                        break
+                    if stats[LIMIT] > 0 and stats[FOUND] >= stats[LIMIT]:
+                        break
+            for v in range(cur):
+                if (chosen >> v) & 1:
+                    adj[v] ^= 1 << cur
+            adj[cur] = 0
+            return True
+
+        found = False
+        remaining = 0
+        c = candidates
+        while c:
+            c &= c - 1
+            remaining += 1
+        v = 0
+        while remaining >= size:
+            if (candidates >> v) & 1:
+                candidates ^= 1 << v
+                remaining -= 1
+                # Later picks must come after v and avoid its neighbors
+                if _build(adj, cur, N, k, candidates & ~adj[v], size - 1, chosen | (1 << v), stats, matches):
+                    found = True
+                if stats[LIMIT] > 0 and stats[FOUND] >= stats[LIMIT]:
+                    break
+            v += 1
+        return found
+
+    def search(prefix_adj, N, k, limit=0):
+        """
+        Checks Psi_k (k >= 1) on every labeled triangle-free graph on N <= MAX_CORE_N
+        vertices that extends the graph given by prefix_adj (neighbor bitmasks
+        of its first vertices), stopping after `limit` matches if limit > 0.
+        Returns (number of graphs generated, list of matching adjacency lists).
+        """
+        n0 = len(prefix_adj)
+        adj = np.zeros(N, dtype=np.int64)
+        adj[:n0] = prefix_adj
+        stats = np.zeros(3, dtype=np.int64)
+        stats[LIMIT] = limit
+        matches = List.empty_list(types.int64[::1])
+        if n0 == N:
+            stats[COUNT] = 1
+            if psi_k_core(adj, N, k):
+                matches.append(adj.copy())
+        else:
+            all_prev = (1 << n0) - 1
+            for r in range(n0 + 1):
+                if not _build(adj, n0, N, k, all_prev, r, 0, stats, matches):
+                    break
+                if limit > 0 and stats[FOUND] >= limit:
+                    break
+        return int(stats[COUNT]), [[int(a) for a in row] for row in matches]
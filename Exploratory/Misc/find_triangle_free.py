@@ -1,13 +1,123 @@
 import networkx as nx
-import itertools
 import argparse
-import sys
+import multiprocessing
+
+from psi_core import NUMBA_AVAILABLE, MAX_CORE_N, psi_k
+import build_core
+
+# pynauty is optional; without it isomorphism classes are found with a
+# Weisfeiler-Lehman hash plus an exact networkx check.
+try:
+    import pynauty
+    PYNAUTY_AVAILABLE = True
+except ImportError:
+    PYNAUTY_AVAILABLE = False
+
+class BitGraph:
+    """
+    Graph on vertices 0..n-1 stored as neighbor bitmasks:
+    bit v of adj[u] is set iff u and v are adjacent.
+    """
+    def __init__(self, adj=None):
+        self.adj = list(adj) if adj else []
+
+    @property
+    def n(self):
+        return len(self.adj)
+
+    @classmethod
+    def from_networkx(cls, G):
+        """Builds a BitGraph from G, numbering vertices in G.nodes() order."""
+        nodes = list(G.nodes())
+        idx = {v: i for i, v in enumerate(nodes)}
+        adj = [0] * len(nodes)
+        for u, v in G.edges():
+            if u == v:
+                continue
+            adj[idx[u]] |= 1 << idx[v]
+            adj[idx[v]] |= 1 << idx[u]
+        return cls(adj)
+
+    def to_networkx(self):
+        """Builds the equivalent networkx graph on nodes 0..n-1."""
+        G = nx.Graph()
+        for v in range(self.n):
+            G.add_node(v)
+            # Edges to earlier vertices, in the order _recursive_build adds them
+            for u in iter_bits(self.adj[v] & ((1 << v) - 1)):
+                G.add_edge(v, u)
+        return G
+
+    def add_vertex(self, mask):
+        """Appends a new vertex adjacent to the vertices in mask."""
+        new_bit = 1 << self.n
+        for v in iter_bits(mask):
+            self.adj[v] |= new_bit
+        self.adj.append(mask)
+
+    def remove_last_vertex(self):
+        """Undoes the most recent add_vertex."""
+        mask = self.adj.pop()
+        new_bit = 1 << self.n
+        for v in iter_bits(mask):
+            self.adj[v] ^= new_bit
+
+class IsomorphismFilter:
+    """
+    Remembers the isomorphism classes of the BitGraphs it has seen.
+    is_new(bg) returns True the first time a class is seen, False afterwards.
+    """
+    def __init__(self):
+        # pynauty: set of certificates.
+        # Fallback: WL profile -> list of representative nx.Graph objects.
+        self.seen = set() if PYNAUTY_AVAILABLE else {}
+
+    def is_new(self, bg):
+        if PYNAUTY_AVAILABLE:
+            g = pynauty.Graph(bg.n, adjacency_dict={v: list(iter_bits(a)) for v, a in enumerate(bg.adj)})
+            cert = pynauty.certificate(g)
+            if cert in self.seen:
+                return False
+            self.seen.add(cert)
+            return True
+
+        # Graphs with different profiles can't be isomorphic, so only
+        # compare against representatives in the same bucket.
+        reps = self.seen.setdefault(wl_profile(bg.adj), [])
+        G = bg.to_networkx()
+        for H in reps:
+            if nx.is_isomorphic(G, H):
+                return False
+        reps.append(G)
+        return True
+
+def wl_profile(adj, waves=3):
+    """
+    Isomorphism-invariant profile of a bitmask graph via Weisfeiler-Lehman
+    color refinement: start from degrees, then repeatedly recolor each vertex
+    by its own color and the sorted colors of its neighbors.
+    """
+    color = [bin(a).count('1') for a in adj]
+    for _ in range(waves):
+        color = [hash((color[v], tuple(sorted(color[u] for u in iter_bits(a))))) for v, a in enumerate(adj)]
+    return tuple(sorted(color))
+
+def iter_bits(mask):
+    """Yields the indices of the set bits of mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
 
 def is_independent_set(G, nodes):
     """Checks if the given set of nodes forms an Independent Set."""
-    for u, v in itertools.combinations(nodes, 2):
-        if G.has_edge(u, v):
-            return False
+    nodes = list(nodes)
+    # Look each node's neighbors up once instead of calling has_edge per pair
+    for i, u in enumerate(nodes):
+        nbrs = G.adj[u]
+        for v in nodes[i + 1:]:
+            if v in nbrs:
+                return False
     return True
 
 def check_properties(G, k):
@@ -17,9 +127,17 @@ def check_properties(G, k):
     Psi_k: For all x_1,...,x_k (Independent Set), and y_1,...,y_k (disjoint from x),
     there exists a z which is connected to all x_i but not any y_i.
     """
-    nodes = list(G.nodes())
+    bg = G if isinstance(G, BitGraph) else BitGraph.from_networkx(G)
+    adj = bg.adj
+    n = bg.n
+    
+    # Use the compiled kernel when the bitmasks fit in one machine word
+    if NUMBA_AVAILABLE and n <= MAX_CORE_N and k >= 1:
+        return psi_k(adj, k)
+    
+    all_nodes = (1 << n) - 1
     # Property requires existence of sets of size k.
-    if len(nodes) < 2 * k + 1:
+    if n < 2 * k + 1:
         # We need k nodes for X, k for Y, and 1 for z.
         # If not enough nodes, the condition "For all X, Y... exists z" fails if X, Y exist but z doesn't.
         # If X or Y can't even be formed, is it true or false?
@@ -29,82 +147,155 @@ def check_properties(G, k):
         
         # Let's check if any valid X, Y pair exists.
         # If the graph is too small to have ANY disjoint X, Y of size k, then the condition is True vacuously.
-        if len(nodes) < 2 * k:
+        if n < 2 * k:
              return True
         # If we have >= 2k nodes but < 2k+1, we might have X, Y but no room for z.
         # In that case, if we find such X, Y, return False.
         pass
 
     # 1. Iterate all Independent Sets X of size k
-    for X in itertools.combinations(nodes, k):
-        if not is_independent_set(G, X):
-            continue
-        
-        X_set = set(X)
-        remaining_nodes = [node for node in nodes if node not in X_set]
+    # Enumerated directly, so non-independent k-subsets are never visited
+    for X_mask in independent_subsets(adj, all_nodes, k):
+        outside_X = all_nodes & ~X_mask
+        # Vertices adjacent to all of X
+        Z_mask = all_nodes
+        for x in iter_bits(X_mask):
+            Z_mask &= adj[x]
         
-        # 2. Iterate all sets Y of size k disjoint from X
-        # Note: If no such Y exists, the inner loop doesn't run, 
-        # so we don't return False, effectively passing this X check.
-        for Y in itertools.combinations(remaining_nodes, k):
-            Y_set = set(Y)
-            
-            # 3. Search for a witness z
-            candidates = [u for u in remaining_nodes if u not in Y_set]
-            
-            witness_found = False
-            for z in candidates:
-                neighbors = set(G.neighbors(z))
-                # Connected to all X?
-                if not X_set.issubset(neighbors):
-                    continue
-                # Not connected to any Y?
-                if not Y_set.isdisjoint(neighbors):
-                    continue
-                
-                witness_found = True
-                break
-            
-            if not witness_found:
-                # Found a pair (X, Y) with no witness z
-                return False
+        # 2. Look for a set Y of size k disjoint from X with no witness z
+        # z must be connected to all of X and to none of Y, so Y has no
+        # witness iff every z in Z_mask is in Y or adjacent to it.
+        # There are n - k >= k vertices outside X, so a smaller cover can
+        # always be padded up to size k.
+        if covers(adj, Z_mask, outside_X, k):
+            # Found a pair (X, Y) with no witness z
+            return False
 
     return True
 
-def generate_triangle_free_graphs(N):
+def independent_subsets(adj, candidates, size, chosen=0):
+    """
+    Yields, as bitmasks in lexicographic order, every independent set of the
+    given size made of chosen plus vertices from candidates.
+    candidates must not contain chosen or any neighbor of it.
+    """
+    if size == 0:
+        yield chosen
+        return
+    while candidates and bin(candidates).count('1') >= size:
+        low = candidates & -candidates
+        candidates ^= low
+        # Later picks must come after v and avoid its neighbors
+        yield from independent_subsets(adj, candidates & ~adj[low.bit_length() - 1], size - 1, chosen | low)
+
+def covers(adj, targets, candidates, size):
+    """
+    Checks if at most size vertices of candidates cover targets, where a
+    vertex covers itself and its neighbors.
+    """
+    if not targets:
+        return True
+    if size == 0:
+        return False
+    # The lowest uncovered target must be covered by itself or a neighbor
+    z = (targets & -targets).bit_length() - 1
+    choices = candidates & (adj[z] | (1 << z))
+    for y in iter_bits(choices):
+        # Later branches may skip y: this one already tried it
+        candidates &= ~(1 << y)
+        if covers(adj, targets & ~adj[y] & ~(1 << y), candidates, size - 1):
+            return True
+    return False
+
+def generate_triangle_free_graphs(N, unique=False):
     """
     Generates all labeled triangle-free graphs of size N.
     Uses recursive backtracking by adding nodes one by one, 
     connecting only to independent sets of the previous graph.
+    With unique=True only one graph per isomorphism class is generated.
+    """
+    for bg in generate_triangle_free_bitgraphs(N, unique):
+        yield bg.to_networkx()
+
+def generate_triangle_free_bitgraphs(N, unique=False, prefix=()):
+    """
+    Same as generate_triangle_free_graphs, but yields BitGraph objects.
+    The same BitGraph is modified in place as the search backtracks,
+    so copy bg.adj if a graph needs to outlive the next iteration.
+    prefix fixes the neighbor masks of the first added vertices (see generate_prefixes),
+    restricting the search to the graphs that start with that partial graph.
     """
     # Start with a single node 0
-    G = nx.Graph()
-    G.add_node(0)
-    yield from _recursive_build(G, N)
+    bg = BitGraph([0])
+    for mask in prefix:
+        bg.add_vertex(mask)
+    # Isomorphic partial graphs have isomorphic extensions, so in unique mode
+    # each depth only keeps the first graph of every isomorphism class.
+    seen_by_depth = {} if unique else None
+    yield from _recursive_build(bg, N, seen_by_depth)
 
-def _recursive_build(G, target_size):
-    current_size = G.number_of_nodes()
+def generate_prefixes(N, depth, unique=False):
+    """
+    Yields the neighbor masks (towards earlier vertices) of the first `depth`
+    added vertices for every partial graph of the search. Each prefix is an
+    independent shard of generate_triangle_free_bitgraphs(N, unique, prefix).
+    """
+    size = min(N, depth + 1)
+    seen_by_depth = {} if unique else None
+    for bg in _recursive_build(BitGraph([0]), size, seen_by_depth):
+        yield [bg.adj[v] & ((1 << v) - 1) for v in range(1, bg.n)]
+
+def use_compiled_search(N, k, unique=False):
+    """Whether build_core can run the whole labeled search for these parameters."""
+    return NUMBA_AVAILABLE and not unique and k >= 1 and N <= MAX_CORE_N
+
+def _search_shard(task):
+    """
+    Pool worker: checks every graph that completes one prefix.
+    task: (N, k, prefix, unique)
+    Returns: (number of graphs generated, adjacency lists of the graphs satisfying Psi_k)
+    """
+    N, k, prefix, unique = task
+    if use_compiled_search(N, k, unique):
+        bg = BitGraph([0])
+        for mask in prefix:
+            bg.add_vertex(mask)
+        return build_core.search(bg.adj, N, k)
+    count = 0
+    matches = []
+    for bg in generate_triangle_free_bitgraphs(N, unique, prefix):
+        count += 1
+        if check_properties(bg, k):
+            matches.append(list(bg.adj))
+    return count, matches
+
+def _recursive_build(bg, target_size, seen_by_depth=None):
+    current_size = bg.n
+    
+    if seen_by_depth is not None:
+        seen = seen_by_depth.setdefault(current_size, IsomorphismFilter())
+        if not seen.is_new(bg):
+            return
     
     if current_size == target_size:
-        yield G
+        yield bg
         return
 
-    new_node = current_size
-    nodes = list(G.nodes())
-    
-    # Iterate over all subsets of current nodes
     # Only subsets that are Independent Sets can be neighbors of the new node
-    # to maintain the triangle-free property.
-    for r in range(len(nodes) + 1):
-        for neighbors in itertools.combinations(nodes, r):
-            if is_independent_set(G, neighbors):
-                # Valid extension
-                G_new = G.copy()
-                G_new.add_node(new_node)
-                for neighbor in neighbors:
-                    G_new.add_edge(new_node, neighbor)
-                
-                yield from _recursive_build(G_new, target_size)
+    # to maintain the triangle-free property, so enumerate those directly,
+    # by size and then lexicographically (the order of itertools.combinations).
+    all_prev = (1 << current_size) - 1
+    for r in range(current_size + 1):
+        found = False
+        for mask in independent_subsets(bg.adj, all_prev, r):
+            found = True
+            # Valid extension: add the new node, recurse, then undo
+            bg.add_vertex(mask)
+            yield from _recursive_build(bg, target_size, seen_by_depth)
+            bg.remove_last_vertex()
+        if not found:
+            # No independent set of size r means none of any larger size either
+            break
 
 def main():
     parser = argparse.ArgumentParser(description="Search for triangle-free graphs with property Psi_k.")
@@ -112,6 +303,9 @@ def main():
     parser.add_argument("k", type=int, help="Parameter k for property Psi_k")
     parser.add_argument("--limit", type=int, default=0, help="Stop after finding this many graphs (0 for all)")
     parser.add_argument("--show", action="store_true", help="Print edges of found graphs")
+    parser.add_argument("--unique", action="store_true", help="Only check one graph per isomorphism class")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Parallel jobs (default 1)")
+    parser.add_argument("--shard-depth", type=int, default=4, help="Vertices fixed per parallel shard (default 4)")
     
     args = parser.parse_args()
     
@@ -123,25 +317,60 @@ def main():
     count = 0
     found_count = 0
     
-    # We use a set of canonical string representations to avoid strict duplicates if desired, 
-    # but the generator produces labeled graphs. 
-    # For 'all models', we usually list them.
+    # By default the generator produces labeled graphs; for 'all models', we usually list them.
+    # With --unique, isomorphic duplicates are skipped via canonical forms.
     
-    for G in generate_triangle_free_graphs(N):
-        count += 1
-        if check_properties(G, k_param):
-            found_count += 1
-            if args.show:
-                print(f"Graph {found_count}: Edges: {list(G.edges())}")
-            else:
-                # Just print a dot to show progress
-                print(".", end="", flush=True)
-            
-            if args.limit > 0 and found_count >= args.limit:
-                break
+    def report(bg):
+        """Records a match; returns True once --limit is reached."""
+        nonlocal found_count
+        found_count += 1
+        if args.show:
+            print(f"Graph {found_count}: Edges: {list(bg.to_networkx().edges())}")
+        else:
+            # Just print a dot to show progress
+            print(".", end="", flush=True)
+        return args.limit > 0 and found_count >= args.limit
+    
+    if args.jobs > 1:
+        # Shard the search by the first few added vertices; each worker
+        # finishes its shards and sends back only the matching graphs.
+        tasks = [(N, k_param, prefix, args.unique) for prefix in generate_prefixes(N, args.shard_depth, args.unique)]
+        chunksize = max(1, len(tasks) // (args.jobs * 16))
+        # Shards are deduplicated separately, so matches are filtered once more here
+        matches_seen = IsomorphismFilter() if args.unique else None
+        with multiprocessing.Pool(processes=args.jobs) as pool:
+            for shard_count, shard_matches in pool.imap_unordered(_search_shard, tasks, chunksize=chunksize):
+                count += shard_count
+                done = False
+                for adj in shard_matches:
+                    bg = BitGraph(adj)
+                    if matches_seen is not None and not matches_seen.is_new(bg):
+                        continue
+                    if report(bg):
+                        done = True
+                        break
+                if done:
+                    break
+    elif use_compiled_search(N, k_param, args.unique):
+        # The whole search runs compiled; only the matches come back
+        count, matches = build_core.search([0], N, k_param, args.limit)
+        for adj in matches:
+            report(BitGraph(adj))
+    else:
+        for bg in generate_triangle_free_bitgraphs(N, args.unique):
+            count += 1
+            if check_properties(bg, k_param):
+                if report(bg):
+                    break
     
     print(f"\nSearch complete.")
-    print(f"Generated {count} labeled triangle-free graphs.")
+    if args.unique and args.jobs > 1:
+        # Shards are deduplicated separately and their classes overlap, so
+        # only the matches (filtered again above) have a meaningful count
+        print("Generated count not available with --unique and --jobs > 1.")
+    else:
+        kind = "non-isomorphic" if args.unique else "labeled"
+        print(f"Generated {count} {kind} triangle-free graphs.")
     print(f"Found {found_count} graphs satisfying Psi_{k_param}.")
 
 if __name__ == "__main__":
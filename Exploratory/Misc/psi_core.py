@@ -0,0 +1,132 @@
+"""
+Numba-compiled Psi_k check for graphs with at most 63 vertices.
+
+Neighbor bitmasks are held in an int64 array, so the independence and
+witness tests are single machine word ANDs. numba and numpy are optional:
+if they are missing, NUMBA_AVAILABLE is False and callers should use the
+pure Python check in find_triangle_free.
+"""
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Largest number of vertices whose bitmasks fit in a signed 64-bit word
+MAX_CORE_N = 63
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, boundscheck=False)
+    def _next_combination(idx, n):
+        """
+        Advances idx (strictly increasing indices into range(n)) to the next
+        combination in lexicographic order, like itertools.combinations.
+        Returns the first position that changed, or -1 once every
+        combination has been visited.
+        """
+        k = idx.shape[0]
+        i = k - 1
+        while i >= 0 and idx[i] == n - k + i:
+            i -= 1
+        if i < 0:
+            return -1
+        idx[i] += 1
+        for j in range(i + 1, k):
+            idx[j] = idx[j - 1] + 1
+        return i
+
+    @njit(cache=True, boundscheck=False)
+    def _fill_masks(idx, values, adj, masks, nbrs, start):
+        """
+        Prefix bitmasks of a combination: masks[j + 1] is masks[j] plus the bit
+        of v = values[idx[j]], and nbrs[j + 1] is nbrs[j] plus the neighbors of v.
+        Only positions from start on are recomputed, so after
+        _next_combination the update is amortized O(1).
+        """
+        for j in range(start, idx.shape[0]):
+            v = values[idx[j]]
+            masks[j + 1] = masks[j] | (1 << v)
+            nbrs[j + 1] = nbrs[j] | adj[v]
+
+    @njit(cache=True, boundscheck=False)
+    def _lowest_bit(mask):
+        """Index of the lowest set bit of a nonzero mask."""
+        i = 0
+        while not (mask >> i) & 1:
+            i += 1
+        return i
+
+    @njit(cache=True, boundscheck=False)
+    def _covers(adj, targets, candidates, size):
+        """
+        Checks if at most size vertices of candidates cover targets, where a
+        vertex covers itself and its neighbors. Iterative version of
+        find_triangle_free.covers, with one stack frame per chosen vertex.
+        """
+        if targets == 0:
+            return True
+        if size == 0:
+            return False
+        t = np.empty(size, dtype=np.int64)
+        c = np.empty(size, dtype=np.int64)
+        choices = np.empty(size, dtype=np.int64)
+        t[0] = targets
+        c[0] = candidates
+        z = _lowest_bit(targets)
+        choices[0] = candidates & (adj[z] | (1 << z))
+        d = 0
+        while d >= 0:
+            if choices[d] == 0:
+                d -= 1
+                continue
+            low = choices[d] & -choices[d]
+            choices[d] ^= low
+            # Later branches at this depth may skip y: this one covers it
+            c[d] &= ~low
+            left = t[d] & ~adj[_lowest_bit(low)] & ~low
+            if left == 0:
+                return True
+            if d + 1 < size:
+                d += 1
+                t[d] = left
+                c[d] = c[d - 1]
+                z = _lowest_bit(left)
+                choices[d] = c[d] & (adj[z] | (1 << z))
+        return False
+
+    @njit(cache=True, boundscheck=False)
+    def psi_k_core(adj, n, k):
+        """
+        Checks Psi_k on int64 neighbor bitmasks (k >= 1): for every independent
+        X and every Y disjoint from X, both of size k, some z is adjacent to
+        all of X and to none of Y.
+        """
+        if n < 2 * k:
+            return True
+        all_nodes = (1 << n) - 1
+        verts = np.arange(n)
+        x_idx = np.arange(k)
+        x_masks = np.zeros(k + 1, dtype=np.int64)
+        x_nbrs = np.zeros(k + 1, dtype=np.int64)
+        _fill_masks(x_idx, verts, adj, x_masks, x_nbrs, 0)
+        x_changed = 0
+        while x_changed >= 0:
+            X_mask = x_masks[k]
+            if X_mask & x_nbrs[k] == 0:
+                # Vertices adjacent to all of X
+                Z_mask = all_nodes
+                for i in range(k):
+                    Z_mask &= adj[x_idx[i]]
+                # Some Y has no witness iff k vertices outside X cover Z
+                if _covers(adj, Z_mask, all_nodes & ~X_mask, k):
+                    return False
+
+            x_changed = _next_combination(x_idx, n)
+            if x_changed >= 0:
+                _fill_masks(x_idx, verts, adj, x_masks, x_nbrs, x_changed)
+        return True
+
+def psi_k(adj, k):
+    """Runs psi_k_core on a list of Python int bitmasks (len(adj) <= MAX_CORE_N, k >= 1)."""
+    return psi_k_core(np.array(adj, dtype=np.int64), len(adj), k)
@@ -0,0 +1,118 @@
+"""
+Compiled and vectorized cores of the Corollary 4 check (properties 1 and 2).
+
+For graphs with at most 64 vertices, neighbor bitmasks are held in a uint64
+array and checked by numba, so every set operation is a single machine word
+AND. Larger graphs are checked on a NumPy adjacency matrix, with common
+neighbor counts coming from matrix products.
+numba and numpy are optional: if they are missing, NUMBA_AVAILABLE and
+NUMPY_AVAILABLE are False and callers should use the pure Python bitset check.
+"""
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Largest number of vertices whose bitmasks fit in one uint64 word
+MAX_CORE_N = 64
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def check_core_u64(adj, check_isolated):
+        """
+        Checks properties 1 and 2 of Corollary 4 on uint64 neighbor bitmasks:
+        1. Every independent set of size <= 3 has a common neighbor.
+        2. Twin-free (no two vertices have same neighbors).
+        check_isolated=False skips the size 1 case for inputs known to have no isolated vertices.
+        """
+        N = adj.shape[0]
+        zero = np.uint64(0)
+        one = np.uint64(1)
+
+        # Size 1: every vertex needs a neighbor.
+        if check_isolated:
+            for i in range(N):
+                if adj[i] == zero:
+                    return False
+
+        # Size 2: every non-adjacent pair needs a common neighbor.
+        for i in range(N):
+            for j in range(i + 1, N):
+                if (adj[i] >> np.uint64(j)) & one == zero and adj[i] & adj[j] == zero:
+                    return False
+
+        # Size 3: extend each independent pair i < j by a k > j non-adjacent to both.
+        for i in range(N):
+            for j in range(i + 1, N):
+                if (adj[i] >> np.uint64(j)) & one:
+                    continue
+                common_ij = adj[i] & adj[j]
+                not_ij = adj[i] | adj[j]
+                for k in range(j + 1, N):
+                    if (not_ij >> np.uint64(k)) & one == zero and common_ij & adj[k] == zero:
+                        return False
+
+        # Property 2: Twin-free
+        # Twins share a neighbor bitmask, so any repeated value means a twin pair.
+        if np.unique(adj).size != N:
+            return False
+
+        return True
+
+def check_core(adj, check_isolated=True):
+    """Runs check_core_u64 on a list of Python int bitmasks (N <= MAX_CORE_N)."""
+    return check_core_u64(np.array(adj, dtype=np.uint64), check_isolated)
+
+def bitset_adj_to_matrix(adj):
+    """Unpacks neighbor bitmasks into an N x N uint8 adjacency matrix."""
+    N = len(adj)
+    nbytes = (N + 7) // 8
+    buf = b''.join(a.to_bytes(nbytes, 'little') for a in adj)
+    rows = np.frombuffer(buf, dtype=np.uint8).reshape(N, nbytes)
+    return np.unpackbits(rows, axis=1, bitorder='little')[:, :N]
+
+def check_matrix(adj, check_isolated=True):
+    """
+    Same check as check_core_u64 for any N, on a NumPy adjacency matrix.
+    check_isolated=False skips the size 1 case for inputs known to have no isolated vertices.
+    """
+    N = len(adj)
+    A = bitset_adj_to_matrix(adj)
+
+    # Size 1: every vertex needs a neighbor.
+    if check_isolated and not A.any(axis=1).all():
+        return False
+
+    # float32 so the products go through BLAS; counts <= N are exact
+    Af = A.astype(np.float32)
+    non_adj = A == 0
+    np.fill_diagonal(non_adj, False)
+
+    # Size 2: (A @ A)[i, j] counts the common neighbors of i and j.
+    if (non_adj & (Af @ Af == 0)).any():
+        return False
+
+    # Size 3: for each i, restrict the rows to the non-neighbors of i and mask
+    # them by N(i), so that triple[j, k] counts the common neighbors of i, j, k.
+    for i in range(N):
+        js = np.flatnonzero(non_adj[i])
+        if js.size < 2:
+            continue
+        rows = Af[js]
+        triple = (rows * Af[i]) @ rows.T
+        if (non_adj[np.ix_(js, js)] & (triple == 0)).any():
+            return False
+
+    # Property 2: Twin-free
+    # Twins share an adjacency row, so any repeated row means a twin pair.
+    if np.unique(A, axis=0).shape[0] != N:
+        return False
+
+    return True
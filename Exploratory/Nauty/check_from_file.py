@@ -4,37 +4,39 @@ import pickle
 import os
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
 
-# Import the property check function from the existing script
+# Import the property check from the existing script
 try:
-    from generate_with_nauty import check_corollary_4_properties
+    from generate_with_nauty import check_stream, save_graphs
 except ImportError:
     # If running from a different directory, try to append the path
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
     try:
-        from generate_with_nauty import check_corollary_4_properties
+        from generate_with_nauty import check_stream, save_graphs
     except ImportError:
-        print("Error: Could not import 'check_corollary_4_properties' from 'generate_with_nauty.py'.")
+        print("Error: Could not import the property check from 'generate_with_nauty.py'.")
         sys.exit(1)
 
 def load_graphs(file_path):
-    """Loads graphs from a file (g6 or pickle)."""
-    graphs = []
+    """
+    Loads graphs from a file (g6 or pickle) as graph6 bytes.
+    This is a generator: graphs are yielded one at a time so filtering can
+    start right away without holding every graph in memory.
+    Lines are passed on undecoded; the workers decode (and report) them.
+    """
     if file_path.endswith('.g6') or file_path.endswith('.txt'):
         print(f"Loading graphs from g6 file: {file_path}")
         try:
-            with open(file_path, 'r') as f:
+            with open(file_path, 'rb') as f:
                 for line in f:
                     line = line.strip()
-                    if not line: continue
-                    try:
-                        G = nx.from_graph6_bytes(line.encode('ascii'))
-                        graphs.append(G)
-                    except Exception as e:
-                        print(f"Failed to parse graph6 line '{line}': {e}")
+                    if line.startswith(b'>>graph6<<'):
+                        line = line[10:]
+                    if line:
+                        yield line
         except Exception as e:
             print(f"Error reading file {file_path}: {e}")
-            return []
             
     elif file_path.endswith('.pkl') or file_path.endswith('.pickle'):
         print(f"Loading graphs from pickle file: {file_path}")
@@ -43,17 +45,18 @@ def load_graphs(file_path):
                 graphs = pickle.load(f)
         except Exception as e:
             print(f"Error reading pickle file {file_path}: {e}")
-            return []
+            return
+        # Newer pickles hold graph6 bytes; only older nx.Graph pickles need encoding
+        for g in graphs:
+            yield g if isinstance(g, bytes) else nx.to_graph6_bytes(g, header=False).strip()
     else:
         print(f"Unsupported file extension for {file_path}. Please use .g6, .txt, .pkl, or .pickle")
-        return []
-    
-    return graphs
 
 def main():
     parser = argparse.ArgumentParser(description="Check graphs from a file against Corollary 4 properties.")
     parser.add_argument("input_file", type=str, help="Path to the input file containing graphs (.g6 or .pkl)")
-    parser.add_argument("--output", type=str, default="filtered_graphs.pkl", help="Output file for matching graphs (pickle)")
+    parser.add_argument("--output", type=str, default="filtered_graphs.pkl", help="Output file for matching graphs (.pkl, or .g6 for graph6 lines)")
+    parser.add_argument("--assume-geng-prefiltered", action="store_true", help="Input comes from geng with min degree >= 1; skip the isolated vertex check")
     
     args = parser.parse_args()
     
@@ -61,39 +64,33 @@ def main():
         print(f"Error: Input file '{args.input_file}' not found.")
         sys.exit(1)
         
-    start_load = time.time()
-    graphs = load_graphs(args.input_file)
-    end_load = time.time()
-    
-    if not graphs:
-        print("No graphs loaded. Exiting.")
-        sys.exit(0)
-        
-    print(f"Loaded {len(graphs)} graphs in {end_load - start_load:.2f} seconds.")
-    
     print("Checking graphs for Corollary 4 properties...")
     start_check = time.time()
     valid_graphs = []
+    tested = 0
     
-    for i, G in enumerate(graphs):
-        if check_corollary_4_properties(G):
-            valid_graphs.append(G)
-        
-        # Progress update every 1000 graphs or 10%
-        if (i + 1) % 1000 == 0 or (i + 1) == len(graphs):
-             print(f"Tested {i+1}/{len(graphs)} | Found: {len(valid_graphs)}", end='\r')
+    # Graphs are sent to the workers as graph6 bytes rather than pickled nx.Graph objects
+    with ProcessPoolExecutor() as executor:
+        for g6 in check_stream(executor, load_graphs(args.input_file), args.assume_geng_prefiltered):
+            tested += 1
+            if g6 is not None:
+                valid_graphs.append(g6)
+            
+            # Progress update every 1000 graphs
+            if tested % 1000 == 0:
+                 print(f"Tested {tested} | Found: {len(valid_graphs)}", end='\r')
              
     end_check = time.time()
-    print(f"\nCheck complete. Found {len(valid_graphs)} matching graphs in {end_check - start_check:.2f} seconds.")
+    
+    if tested == 0:
+        print("No graphs loaded. Exiting.")
+        sys.exit(0)
+        
+    print(f"Tested {tested} | Found: {len(valid_graphs)}")
+    print(f"Check complete. Found {len(valid_graphs)} matching graphs in {end_check - start_check:.2f} seconds.")
     
     if valid_graphs:
-        # Ensure output directory exists if path contains dirs
-        output_dir = os.path.dirname(args.output)
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-            
-        with open(args.output, "wb") as f:
-            pickle.dump(valid_graphs, f)
+        save_graphs(valid_graphs, args.output)
         print(f"Saved matching graphs to {args.output}")
     else:
         print("No matching graphs found.")
@@ -1,24 +1,84 @@
 import subprocess
 import math
 import networkx as nx
-import matplotlib.pyplot as plt
 import argparse
 import pickle
 import os
 import sys
-import itertools
 import time
+import zipfile
+import functools
+import itertools
+import collections
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from check_core import NUMBA_AVAILABLE, NUMPY_AVAILABLE, MAX_CORE_N, check_core, check_matrix, bitset_adj_to_matrix
+
+if NUMPY_AVAILABLE:
+    import numpy as np
 
+# pynauty is optional; without it the Andrasfai test falls back to networkx VF2.
+try:
+    import pynauty
+    PYNAUTY_AVAILABLE = True
+except ImportError:
+    PYNAUTY_AVAILABLE = False
+
+@functools.lru_cache(maxsize=1)
 def check_geng_availability():
-    """Checks if geng is available in the system path."""
+    """Checks (once per process) if geng is available in the system path."""
     try:
         subprocess.run(["geng", "--help"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
         return True
     except FileNotFoundError:
         return False
 
+def enlarge_pipe(stream, size=1 << 20):
+    """
+    Linux only: grows the kernel buffer of a pipe so the writer can run ahead
+    and each read() returns a larger block. Does nothing on other platforms
+    or when the size is above the system limit.
+    """
+    try:
+        import fcntl
+        fcntl.fcntl(stream.fileno(), fcntl.F_SETPIPE_SZ, size)
+    except (ImportError, AttributeError, OSError):
+        pass
+
+def read_g6_lines(stream, block_size=1 << 20):
+    """
+    Yields the non-empty graph6 lines of a binary stream as bytes.
+    Reads large blocks and splits them locally instead of decoding line by line.
+    Buffered streams are read with read1, which returns whatever is already
+    available (up to block_size) instead of waiting for a full block.
+    """
+    read = getattr(stream, 'read1', stream.read)
+    leftover = b''
+    while True:
+        chunk = read(block_size)
+        if not chunk:
+            break
+        *lines, leftover = (leftover + chunk).split(b'\n')
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield line
+    leftover = leftover.strip()
+    if leftover:
+        yield leftover
+
 def generate_graphs(n, res, mod):
-    """Generates triangle-free connected graphs of size n using geng for a specific slice."""
+    """
+    Generates triangle-free connected graphs of size n using geng for a specific slice.
+    Returns the graphs as a list of graph6 byte strings.
+    """
+    return list(stream_graphs(n, res, mod))
+
+def stream_graphs(n, res, mod):
+    """
+    Same as generate_graphs, but yields the graph6 lines as geng produces them,
+    so they can be filtered while geng is still running.
+    """
     # Command: geng -ct n res/mod
     # -c: connected
     # -t: triangle-free
@@ -38,99 +98,421 @@ def generate_graphs(n, res, mod):
     print(f"Running command: {' '.join(cmd)}")
     
     start_time = time.time()
-    graphs = []
+    count = 0
     
     try:
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=1 << 20)
+        enlarge_pipe(process.stdout)
         
-        for line in process.stdout:
-            line = line.strip()
-            if not line: continue
-            try:
-                G = nx.from_graph6_bytes(line.encode('ascii'))
-                graphs.append(G)
-                # print(f"Generated {len(graphs)} graphs...", end='\r') # Reduced verbosity for slice loop
-            except Exception as e:
-                print(f"\nFailed to parse graph6 line '{line}': {e}")
+        # Keep the raw graph6 bytes; graphs are only decoded when filtered
+        for line in read_g6_lines(process.stdout):
+            count += 1
+            yield line
+            # Status only every 10k graphs; printing per line dominates at geng's rate
+            if count % 10000 == 0:
+                print(f"Slice {res}/{mod}: generated {count} graphs...", end='\r', flush=True)
         
         process.wait()
         if process.returncode != 0:
-            stderr = process.stderr.read()
+            stderr = process.stderr.read().decode(errors='replace')
             print(f"\ngeng error: {stderr}")
             
     except Exception as e:
         print(f"Error running geng: {e}")
-        return []
+        return
 
     end_time = time.time()
     elapsed = end_time - start_time
-    print(f"Slice {res}/{mod} complete. Generated: {len(graphs)} graphs. Time: {elapsed:.2f}s.")
-    return graphs
+    print(f"Slice {res}/{mod} complete. Generated: {count} graphs. Time: {elapsed:.2f}s.")
 
-def is_independent_set(G, nodes):
-    """Checks if the given set of nodes forms an Independent Set."""
-    for u, v in itertools.combinations(nodes, 2):
-        if G.has_edge(u, v):
-            return False
-    return True
+# Andrasfai graphs keyed by number of vertices, built on first use
+_andrasfai_cache = {}
+_andrasfai_adj_cache = {}
+_andrasfai_profile_cache = {}
+_andrasfai_spectrum_cache = {}
+
+def andrasfai_bitset_adj(N):
+    """
+    Returns the (cached) neighbor bitmasks of the Andrasfai graph on N = 3k - 1 vertices.
+    Edge (u, v) if (v-u) % N % 3 == 1, i.e. u is joined to u+1, u+4, u+7, ...
+    so every row is the row of vertex 0 rotated by u.
+    """
+    adj = _andrasfai_adj_cache.get(N)
+    if adj is None:
+        base = sum(1 << d for d in range(1, N, 3))
+        all_nodes = (1 << N) - 1
+        adj = [((base << u) | (base >> (N - u))) & all_nodes for u in range(N)]
+        _andrasfai_adj_cache[N] = adj
+    return adj
+
+def andrasfai_graph(N):
+    """Returns the (cached) Andrasfai graph on N = 3k - 1 vertices."""
+    A = _andrasfai_cache.get(N)
+    if A is None:
+        A = bitset_adj_to_graph(andrasfai_bitset_adj(N))
+        _andrasfai_cache[N] = A
+    return A
+
+def common_neighbor_profile(adj):
+    """
+    Isomorphism invariant on neighbor bitmasks: for each vertex, the sorted
+    common neighbor counts with every vertex, collected into a sorted tuple.
+    Unlike degree sequences (and 1-dimensional WL hashes), this separates
+    most regular graphs of the same degree.
+    """
+    rows = []
+    for a in adj:
+        rows.append(tuple(sorted(bin(a & b).count('1') for b in adj)))
+    return tuple(sorted(rows))
+
+def adjacency_spectrum(adj):
+    """Sorted eigenvalues of the adjacency matrix (requires numpy)."""
+    return np.linalg.eigvalsh(bitset_adj_to_matrix(adj).astype(np.float64))
+
+def andrasfai_spectrum(N):
+    """Returns the (cached) adjacency_spectrum of the Andrasfai graph on N vertices."""
+    spectrum = _andrasfai_spectrum_cache.get(N)
+    if spectrum is None:
+        spectrum = adjacency_spectrum(andrasfai_bitset_adj(N))
+        _andrasfai_spectrum_cache[N] = spectrum
+    return spectrum
+
+def andrasfai_profile(N):
+    """Returns the (cached) common_neighbor_profile of the Andrasfai graph on N vertices."""
+    profile = _andrasfai_profile_cache.get(N)
+    if profile is None:
+        profile = common_neighbor_profile(andrasfai_bitset_adj(N))
+        _andrasfai_profile_cache[N] = profile
+    return profile
+
+def bitset_certificate(adj):
+    """Canonical pynauty certificate of a graph given by neighbor bitmasks."""
+    adjacency = {}
+    for i, a in enumerate(adj):
+        adjacency[i] = [j for j in range(len(adj)) if (a >> j) & 1]
+    return pynauty.certificate(pynauty.Graph(len(adj), adjacency_dict=adjacency))
+
+@functools.lru_cache(maxsize=None)
+def andrasfai_certificate(N):
+    """Returns the (cached) pynauty certificate of the Andrasfai graph on N vertices."""
+    return bitset_certificate(andrasfai_bitset_adj(N))
+
+def graph_to_bitset_adj(G):
+    """
+    Converts G to a list of neighbor bitmasks.
+    Bit j of adj[i] is set iff the i-th and j-th nodes of G are adjacent.
+    """
+    nodes = list(G.nodes())
+    idx = {v: i for i, v in enumerate(nodes)}
+    adj = [0] * len(nodes)
+    for u, v in G.edges():
+        adj[idx[u]] |= 1 << idx[v]
+        adj[idx[v]] |= 1 << idx[u]
+    return adj
+
+# Upper-triangle (i, j) pairs in graph6 bit order, keyed by number of vertices
+_g6_pairs_cache = {}
+
+def g6_to_bitset_adj(line):
+    """
+    Decodes a graph6 line (bytes) directly into neighbor bitmasks,
+    without building a networkx graph.
+    Returns (N, adj) in the same format as graph_to_bitset_adj.
+    Raises ValueError if the line is not valid graph6.
+    """
+    line = line.strip()
+    if line.startswith(b'>>graph6<<'):
+        line = line[10:]
+    if not line or min(line) < 63 or max(line) > 126:
+        raise ValueError("not a graph6 string")
+    data = [c - 63 for c in line]
 
-def check_corollary_4_properties(G):
+    # Header: N < 63 takes one byte, larger N are prefixed by 126 (data 63)
+    if data[0] < 63:
+        N = data[0]
+        pos = 1
+    elif len(data) >= 4 and data[1] < 63:
+        N = (data[1] << 12) | (data[2] << 6) | data[3]
+        pos = 4
+    elif len(data) >= 8:
+        N = 0
+        for d in data[2:8]:
+            N = (N << 6) | d
+        pos = 8
+    else:
+        raise ValueError("truncated graph6 header")
+
+    # Every 6 pairs take one data byte, the last one padded with zeros
+    n_pairs = N * (N - 1) // 2
+    if len(data) - pos != (n_pairs + 5) // 6:
+        raise ValueError(f"graph6 data has {len(data) - pos} bytes, expected {(n_pairs + 5) // 6} for N = {N}")
+
+    pairs = _g6_pairs_cache.get(N)
+    if pairs is None:
+        # graph6 packs the upper triangle column by column
+        pairs = [(i, j) for j in range(1, N) for i in range(j)]
+        _g6_pairs_cache[N] = pairs
+
+    bits = 0
+    for d in data[pos:]:
+        bits = (bits << 6) | d
+    # Drop the padding so that pair t sits at bit (len(pairs) - 1 - t)
+    bits >>= 6 * (len(data) - pos) - n_pairs
+
+    adj = [0] * N
+    while bits:
+        low = bits & -bits
+        i, j = pairs[n_pairs - low.bit_length()]
+        adj[i] |= 1 << j
+        adj[j] |= 1 << i
+        bits ^= low
+    return N, adj
+
+def bitset_adj_to_graph(adj):
+    """Builds a networkx graph on nodes 0..N-1 from neighbor bitmasks."""
+    G = nx.empty_graph(len(adj))
+    for i, a in enumerate(adj):
+        # Only walk neighbors above i so each edge is added once
+        a >>= i + 1
+        j = i + 1
+        while a:
+            if a & 1:
+                G.add_edge(i, j)
+            a >>= 1
+            j += 1
+    return G
+
+def check_corollary_4_properties(G, assume_geng_prefiltered=False):
     """
     Checks if graph satisfies Corollary 4 properties:
     1. Every independent set of size <= 3 has a common neighbor.
     2. Twin-free (no two vertices have same neighbors).
     3. Not isomorphic to Andrasfai graph O_{3n-1}.
+    If assume_geng_prefiltered is True, G is taken to come from geng with a
+    positive minimum degree (-d4), so the size 1 case of property 1 is skipped.
     """
-    # Property 1: Common neighbor for IS of size <= 3
-    nodes = list(G.nodes())
-    for k in range(1, 4): # Sizes 1, 2, 3
-        
-        for subset in itertools.combinations(nodes, k):
-            if is_independent_set(G, subset):
-                # Check for common neighbor
-                if not subset:
-                    continue
-                
-                common_neighbors = set(G.neighbors(subset[0]))
-                for node in subset[1:]:
-                    common_neighbors &= set(G.neighbors(node))
-                
-                if not common_neighbors:
-                    return False
+    adj = graph_to_bitset_adj(G)
+    return check_from_bitset(adj, len(adj), G, assume_geng_prefiltered)
 
-    # Property 2: Twin-free
-    for i in range(len(nodes)):
-        for j in range(i + 1, len(nodes)):
-            u, v = nodes[i], nodes[j]
-            if set(G.neighbors(u)) == set(G.neighbors(v)):
-                return False
+def check_from_bitset(adj, N, G=None, assume_geng_prefiltered=False):
+    """
+    Same check as check_corollary_4_properties, but on neighbor bitmasks.
+    G is only needed for the Andrasfai isomorphism test; if it is not
+    given it is rebuilt from adj when that test is reached.
+    """
+    # Properties 1 and 2 run in the compiled core when N fits in one word,
+    # and on a NumPy matrix for larger graphs
+    check_isolated = not assume_geng_prefiltered
+    if NUMBA_AVAILABLE and N <= MAX_CORE_N:
+        if not check_core(adj, check_isolated):
+            return False
+    elif NUMPY_AVAILABLE and N > MAX_CORE_N:
+        if not check_matrix(adj, check_isolated):
+            return False
+    elif not _check_bitset_python(adj, N, check_isolated):
+        return False
 
     # Property 3: Not isomorphic to Andrasfai graph
-    N = G.number_of_nodes()
     # Check if N is of form 3k - 1
-    if (N + 1) % 3 == 0:
-        # Construct Andrasfai graph of size N
-        # Vertices 0..N-1
-        # Edge (u, v) if (v-u) % N % 3 == 1
-        A = nx.Graph()
-        A.add_nodes_from(range(N))
-        for u in range(N):
-            for v in range(u + 1, N):
-                diff = (v - u) % N
-                if diff % 3 == 1:
-                    A.add_edge(u, v)
-        
-        if nx.is_isomorphic(G, A):
+    # The Andrasfai graph is k-regular, so any other degree rules it out in O(N)
+    deg_needed = (N + 1) // 3
+    if (N + 1) % 3 == 0 and all(bin(a).count('1') == deg_needed for a in adj):
+        # Cheap invariants first, then the full isomorphism test
+        if could_be_andrasfai(adj, N):
+            if PYNAUTY_AVAILABLE:
+                # Isomorphic graphs have equal canonical certificates
+                if bitset_certificate(adj) == andrasfai_certificate(N):
+                    return False
+            else:
+                if G is None:
+                    G = bitset_adj_to_graph(adj)
+                if nx.is_isomorphic(G, andrasfai_graph(N)):
+                    return False
+
+    return True
+
+def could_be_andrasfai(adj, N):
+    """
+    Invariant screen for a k-regular graph on N = 3k - 1 vertices: False if it
+    is certainly not isomorphic to the Andrasfai graph.
+    Degree based invariants can't separate regular graphs, so this compares
+    common neighbor counts and, with numpy, adjacency spectra.
+    """
+    if common_neighbor_profile(adj) != andrasfai_profile(N):
+        return False
+    # Isomorphic graphs are cospectral
+    if NUMPY_AVAILABLE and not np.allclose(adjacency_spectrum(adj), andrasfai_spectrum(N)):
+        return False
+    return True
+
+def _check_bitset_python(adj, N, check_isolated=True):
+    """
+    Properties 1 and 2 of Corollary 4 on Python int bitmasks of any size.
+    check_isolated=False skips the size 1 case for inputs known to have no isolated vertices.
+    """
+    all_nodes = (1 << N) - 1
+
+    # Property 1: Common neighbor for IS of size <= 3
+    # Size 1: every vertex needs a neighbor.
+    if check_isolated and not all(adj):
+        return False
+
+    # Size 2: every non-adjacent pair i < j needs a common neighbor.
+    # non_nbrs_above[i] holds the non-neighbors of i with index > i.
+    non_nbrs_above = []
+    for i in range(N):
+        candidates = all_nodes & ~((2 << i) - 1) & ~adj[i]
+        non_nbrs_above.append(candidates)
+        while candidates:
+            low = candidates & -candidates
+            j = low.bit_length() - 1
+            if adj[i] & adj[j] == 0:
+                return False
+            candidates ^= low
+
+    # Size 3: only extend the independent pairs i < j found above
+    # by a third vertex k > j that is non-adjacent to both.
+    for i in range(N):
+        js = non_nbrs_above[i]
+        while js:
+            low = js & -js
+            j = low.bit_length() - 1
+            js ^= low
+            common_ij = adj[i] & adj[j]
+            ks = js & non_nbrs_above[j]
+            while ks:
+                low_k = ks & -ks
+                k = low_k.bit_length() - 1
+                if common_ij & adj[k] == 0:
+                    return False
+                ks ^= low_k
+
+    # Property 2: Twin-free
+    # Twins share a neighbor bitmask, so a repeated mask means a twin pair.
+    seen_masks = {}
+    for i, a in enumerate(adj):
+        if a in seen_masks:
             return False
+        seen_masks[a] = i
 
     return True
 
+def _check_one(g6, assume_geng_prefiltered=False):
+    """
+    Process pool worker: returns the graph6 line if the graph satisfies
+    the Corollary 4 properties, otherwise None.
+    Graphs cross the process boundary as graph6 bytes to keep pickling cheap.
+    """
+    try:
+        N, adj = g6_to_bitset_adj(g6)
+    except ValueError as e:
+        # Report and skip the line rather than aborting the whole run
+        print(f"Failed to parse graph6 line '{g6.decode(errors='replace')}': {e}")
+        return None
+    if check_from_bitset(adj, N, assume_geng_prefiltered=assume_geng_prefiltered):
+        return g6
+    return None
+
+def _check_batch(batch, assume_geng_prefiltered=False):
+    """Process pool worker: runs _check_one over a list of graph6 lines."""
+    return [_check_one(g6, assume_geng_prefiltered) for g6 in batch]
+
+def check_stream(executor, g6_lines, assume_geng_prefiltered=False, batch_size=256, max_pending=None):
+    """
+    Runs _check_one over a (possibly lazy) iterable of graph6 lines on executor
+    and yields the results in input order.
+    Unlike executor.map, at most max_pending batches are submitted at a time,
+    so the input is consumed as the workers keep up instead of all at once.
+    """
+    if max_pending is None:
+        max_pending = 4 * (os.cpu_count() or 1)
+    g6_lines = iter(g6_lines)
+    pending = collections.deque()
+    for batch in iter(lambda: list(itertools.islice(g6_lines, batch_size)), []):
+        pending.append(executor.submit(_check_batch, batch, assume_geng_prefiltered))
+        if len(pending) >= max_pending:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+def filter_slice(n, res, mod, executor, max_pending=None):
+    """
+    Generates one geng slice and filters it on the shared process pool.
+    Batches are sent to the workers while geng is still running, so only
+    the graphs that pass are ever held in memory.
+    max_pending bounds the batches in flight (see check_stream).
+    Returns (res, list of graph6 lines that passed).
+    """
+    print(f"--- Processing Slice {res}/{mod} ---")
+    # geng runs with -d4, so its output never has isolated vertices
+    results = check_stream(executor, stream_graphs(n, res, mod), True, batch_size=1024, max_pending=max_pending)
+    slice_valid = [g6 for g6 in results if g6 is not None]
+    return res, slice_valid
+
+GRAPHML_HEADER = (
+    b"<?xml version='1.0' encoding='utf-8'?>\n"
+    b'<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+    b'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    b'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+    b'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n'
+    b'  <graph edgedefault="undirected">\n'
+)
+GRAPHML_FOOTER = b'  </graph>\n</graphml>\n'
+
+def write_graphml_fast(adj, f):
+    """
+    Writes the graph given by neighbor bitmasks as GraphML to a binary file object.
+    Produces the same layout as nx.write_graphml for an unattributed graph on
+    nodes 0..N-1, without going through the generic XML serializer.
+    """
+    parts = [GRAPHML_HEADER]
+    parts.extend(f'    <node id="{i}" />\n'.encode() for i in range(len(adj)))
+    for i, a in enumerate(adj):
+        # Only walk neighbors above i so each edge is written once
+        a >>= i + 1
+        j = i + 1
+        while a:
+            if a & 1:
+                parts.append(f'    <edge source="{i}" target="{j}" />\n'.encode())
+            a >>= 1
+            j += 1
+    parts.append(GRAPHML_FOOTER)
+    f.write(b''.join(parts))
+
+def save_graphs(graphs, path):
+    """
+    Saves graphs as graph6, one per line (like geng and run_manager.py output).
+    .pkl/.pickle paths get a pickled list of graph6 byte strings instead.
+    graphs may contain nx.Graph objects or graph6 bytes.
+    """
+    data = [g if isinstance(g, bytes) else nx.to_graph6_bytes(g, header=False).strip() for g in graphs]
+    
+    # Ensure output directory exists if path contains dirs
+    output_dir = os.path.dirname(path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        
+    with open(path, "wb") as f:
+        if path.endswith('.pkl') or path.endswith('.pickle'):
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            for g6 in data:
+                f.write(g6 + b'\n')
+
 def visualize_graphs(graphs, n, output_dir, n_show=4):
-    """Visualizes a few graphs."""
+    """
+    Visualizes a few graphs.
+    graphs may contain nx.Graph objects or graph6 bytes; only the ones drawn are decoded.
+    """
     if not graphs:
         print("No graphs to visualize.")
         return
 
+    # Imported here so CLI runs and pool workers don't pay for matplotlib
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
     n_show = min(len(graphs), n_show)
     cols = 2
     rows = (n_show + 1) // 2
@@ -139,7 +521,10 @@ def visualize_graphs(graphs, n, output_dir, n_show=4):
     
     for i in range(n_show):
         plt.subplot(rows, cols, i + 1)
-        nx.draw(graphs[i], with_labels=True, node_color='lightblue', edge_color='gray')
+        G = graphs[i]
+        if isinstance(G, bytes):
+            G = bitset_adj_to_graph(g6_to_bitset_adj(G)[1])
+        nx.draw(G, with_labels=True, node_color='lightblue', edge_color='gray')
         plt.title(f"Graph {i+1}")
         
     output_img = os.path.join(output_dir, f"graphs_visualization_n{n}.png")
@@ -148,10 +533,18 @@ def visualize_graphs(graphs, n, output_dir, n_show=4):
     print(f"Visualization saved to {output_img}")
     # plt.show() # Skip show in non-interactive environments if needed, but keeping it is fine as it just prints if no backend.
 
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return n
+
 def main():
     parser = argparse.ArgumentParser(description="Generate triangle-free connected graphs using Nauty (geng) and filter by Corollary 4.")
     parser.add_argument("N", type=int, help="Number of vertices")
-    parser.add_argument("--output", type=str, default="generated_graphs.pkl", help="Output file for graphs (pickle)")
+    parser.add_argument("--output", type=str, default="generated_graphs.g6", help="Output file for graphs (.g6, or .pkl for a pickle)")
+    parser.add_argument("--jobs", "-j", type=positive_int, default=os.cpu_count() or 1, help="Parallel filter processes (default: all cores)")
     
     args = parser.parse_args()
     
@@ -164,9 +557,8 @@ def main():
     results_dir = os.path.join(script_dir, "results")
     os.makedirs(results_dir, exist_ok=True)
     
-    # Setup graphml directory
-    graphml_dir = os.path.join(results_dir, f"graphml_n{args.N}")
-    os.makedirs(graphml_dir, exist_ok=True)
+    # All graphml files go into one archive instead of one file per graph
+    graphml_archive_path = os.path.join(results_dir, f"graphml_n{args.N}.zip")
     
     # Prompt for denominator (modulus)
     try:
@@ -179,45 +571,47 @@ def main():
         
     print(f"Generating triangle-free connected graphs of size {args.N} in {modulus} slices...")
     
-    total_valid_graphs = []
+    total_valid_g6 = []
     
     start_total_time = time.time()
     
-    for res in range(modulus):
-        # res is 0-indexed in range, but geng might expect 0..mod-1.
-        # geng syntax: res/mod where 0 <= res < mod.
-        
-        print(f"--- Processing Slice {res}/{modulus} ---")
-        slice_graphs = generate_graphs(args.N, res, modulus)
-        
-        if not slice_graphs:
-            continue
-            
-        print(f"Filtering {len(slice_graphs)} graphs from slice {res}/{modulus}...")
-        
-        slice_valid = []
-        for G in slice_graphs:
-            if check_corollary_4_properties(G):
-                slice_valid.append(G)
+    # Slices run concurrently. geng and the filter workers are separate
+    # processes, so a thread per slice is enough to keep them all busy.
+    n_threads = min(modulus, args.jobs)
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        # Start the workers now, while this is the only thread: on Linux they
+        # are forked, and forking once the slice threads run is unsafe
+        executor.submit(int).result()
+        with ThreadPoolExecutor(max_workers=n_threads) as slice_pool, \
+                zipfile.ZipFile(graphml_archive_path, 'w', zipfile.ZIP_DEFLATED) as graphml_archive:
+            # res is 0-indexed in range, but geng might expect 0..mod-1.
+            # geng syntax: res/mod where 0 <= res < mod.
+            futures = [slice_pool.submit(filter_slice, args.N, res, modulus, executor, 4 * args.jobs) for res in range(modulus)]
         
-        print(f"Slice {res}/{modulus}: Found {len(slice_valid)} valid graphs.")
+            # Results are only written from this thread, so the archive needs no lock
+            for future in as_completed(futures):
+                res, slice_valid = future.result()
+                print(f"Slice {res}/{modulus}: Found {len(slice_valid)} valid graphs.")
         
-        if slice_valid:
-            # Save as .graphml files incrementally
-            for G in slice_valid:
-                graph_idx = len(total_valid_graphs) + 1
-                graphml_path = os.path.join(graphml_dir, f"graph_{graph_idx}.graphml")
-                nx.write_graphml(G, graphml_path)
-                total_valid_graphs.append(G)
+                if slice_valid:
+                    # Add .graphml files to the archive incrementally
+                    for g6 in slice_valid:
+                        # GraphML is written straight from the bitmasks, no networkx graph needed
+                        graph_idx = len(total_valid_g6) + 1
+                        with graphml_archive.open(f"graph_{graph_idx}.graphml", 'w') as fh:
+                            write_graphml_fast(g6_to_bitset_adj(g6)[1], fh)
+                        total_valid_g6.append(g6)
             
-            print(f"Total valid graphs so far: {len(total_valid_graphs)}. Saved to {graphml_dir}")
+                    print(f"Total valid graphs so far: {len(total_valid_g6)}. Saved to {graphml_archive_path}")
 
     end_total_time = time.time()
     print(f"\nAll slices complete. Total time: {end_total_time - start_total_time:.2f} seconds.")
-    print(f"Total valid graphs found: {len(total_valid_graphs)}")
+    print(f"Total valid graphs found: {len(total_valid_g6)}")
     
-    if total_valid_graphs:
-        visualize_graphs(total_valid_graphs, args.N, results_dir)
+    if total_valid_g6:
+        save_graphs(total_valid_g6, args.output)
+        print(f"Saved matching graphs to {args.output}")
+        visualize_graphs(total_valid_g6, args.N, results_dir)
     else:
         print("No graphs found matching the criteria.")
 
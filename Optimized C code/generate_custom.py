@@ -44,10 +44,13 @@ def compile_filter():
             
     return output_file
 
-def generate_custom_graphs(n, res, mod, min_deg=3, max_deg=None, output_file=None, quiet=False):
-    """
-    Generates graphs using geng and filters them using the custom C program.
-    """
+def count_lines(path):
+    """Counts the lines of a file (like wc -l) without loading it into memory."""
+    with open(path, 'rb') as f:
+        return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 16), b''))
+
+def build_pipeline(n, res, mod, min_deg=3, max_deg=None, quiet=False):
+    """Returns (filter executable, geng command) for one slice."""
     filter_exe = compile_filter()
     
     # Set default max_deg if not provided
@@ -80,9 +83,21 @@ def generate_custom_graphs(n, res, mod, min_deg=3, max_deg=None, output_file=Non
         print(f"Running pipeline: {' '.join(geng_cmd)} | {os.path.basename(filter_exe)}")
         print(f"Edge bounds: {edge_range}")
         print(f"Degree bounds: {min_deg}-{max_deg}")
+    
+    return filter_exe, geng_cmd
+
+def generate_custom_graphs(n, res, mod, min_deg=3, max_deg=None, output_file=None, quiet=False):
+    """
+    Generates graphs using geng and filters them using the custom C program.
+    Returns the graph6 strings as a list (empty on error), also saving them
+    to output_file if given. Use write_custom_graphs to stream a large slice
+    straight to a file instead.
+    """
+    filter_exe, geng_cmd = build_pipeline(n, res, mod, min_deg, max_deg, quiet)
 
     start_time = time.time()
     count = 0
+    valid_graphs = []
     
     try:
         # Create pipeline
@@ -93,7 +108,6 @@ def generate_custom_graphs(n, res, mod, min_deg=3, max_deg=None, output_file=Non
         geng_proc.stdout.close()
         
         # Read output from filter
-        valid_graphs = []
         for line in filter_proc.stdout:
             line = line.strip()
             if line:
@@ -123,6 +137,53 @@ def generate_custom_graphs(n, res, mod, min_deg=3, max_deg=None, output_file=Non
         
     return valid_graphs
 
+def write_custom_graphs(n, res, mod, output_file, min_deg=3, max_deg=None, quiet=False):
+    """
+    Same pipeline as generate_custom_graphs, but the filter writes straight
+    into output_file, so the graphs are never held in memory.
+    Returns the number of graphs written. No file is left behind if none are
+    found; on error the partial file is removed and the exception is re-raised.
+    """
+    filter_exe, geng_cmd = build_pipeline(n, res, mod, min_deg, max_deg, quiet)
+
+    start_time = time.time()
+    geng_proc = None
+    
+    try:
+        geng_proc = subprocess.Popen(geng_cmd, stdout=subprocess.PIPE, stderr=sys.stderr)
+        with open(output_file, 'wb') as out:
+            filter_proc = subprocess.Popen([filter_exe], stdin=geng_proc.stdout, stdout=out)
+            # Allow geng_proc to receive a SIGPIPE if filter_proc exits.
+            geng_proc.stdout.close()
+            filter_proc.wait()
+            geng_proc.wait()
+        if filter_proc.returncode != 0:
+            raise RuntimeError(f"{os.path.basename(filter_exe)} exited with status {filter_proc.returncode}")
+        count = count_lines(output_file)
+        
+    except Exception as e:
+        if not quiet:
+            print(f"Error during generation: {e}")
+        if geng_proc is not None and geng_proc.poll() is None:
+            geng_proc.kill()
+            geng_proc.wait()
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        raise
+        
+    end_time = time.time()
+    elapsed = end_time - start_time
+    
+    if not quiet:
+        print(f"Slice {res}/{mod} complete. Found {count} valid graphs in {elapsed:.2f}s.")
+    
+    if count == 0:
+        # Do not leave an empty file behind when nothing was found
+        os.remove(output_file)
+    elif not quiet:
+        print(f"Saved {count} graphs to {output_file}")
+    return count
+
 def main():
     parser = argparse.ArgumentParser(description="Generate Twin-free Maximal Triangle-free Biconnected graphs.")
     parser.add_argument("N", type=int, help="Number of vertices")
@@ -141,7 +202,10 @@ def main():
             deg_str += f"_{args.max_deg}"
         args.output = f"graphs_n{args.N}{deg_str}_{args.res}_{args.mod}.g6"
         
-    generate_custom_graphs(args.N, args.res, args.mod, args.min_deg, args.max_deg, args.output)
+    try:
+        write_custom_graphs(args.N, args.res, args.mod, args.output, args.min_deg, args.max_deg)
+    except Exception:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -6,6 +6,7 @@ import multiprocessing
 import statistics
 import datetime
 import math
+import shutil
 
 # Ensure we can import from the same directory
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -13,7 +14,7 @@ if script_dir not in sys.path:
     sys.path.append(script_dir)
 
 try:
-    from generate_custom import generate_custom_graphs
+    from generate_custom import write_custom_graphs
 except ImportError:
     print("Error: Could not import 'generate_custom.py'. Make sure it is in the same directory.")
     sys.exit(1)
@@ -21,16 +22,19 @@ except ImportError:
 def worker_task(args):
     """
     Wrapper for multiprocessing.
-    args: (n, res, mod, min_deg, max_deg)
-    Returns: (res, count, elapsed_time, graphs)
+    args: (n, res, mod, min_deg, max_deg, part_file)
+    Returns: (res, count, elapsed_time, error)
+    The graphs are written to part_file (removed if none are found), so only
+    the count goes back through the pool.
     """
-    n, res, mod, min_deg, max_deg = args
+    n, res, mod, min_deg, max_deg, part_file = args
     start = time.time()
     try:
         # Run quietly to avoid console spam
-        graphs = generate_custom_graphs(n, res, mod, min_deg, max_deg, output_file=None, quiet=True)
+        # Raises (after removing part_file) if the pipeline fails
+        count = write_custom_graphs(n, res, mod, part_file, min_deg, max_deg, quiet=True)
         elapsed = time.time() - start
-        return (res, len(graphs), elapsed, graphs)
+        return (res, count, elapsed, None)
     except Exception as e:
         return (res, 0, 0, str(e))
 
@@ -129,9 +133,10 @@ def main():
             sys.exit(0)
 
     # Prepare tasks
-    tasks = [(n, r, mod, min_deg, max_deg) for r in range(mod)]
+    # Each slice writes to its own part file, appended to output_file as it finishes
+    tasks = [(n, r, mod, min_deg, max_deg, f"{output_file}.part{r}") for r in range(mod)]
     
-    all_graphs = []
+    total_graphs = 0
     stats = []
     
     start_total = time.time()
@@ -140,17 +145,24 @@ def main():
     
     # Use multiprocessing Pool
     completed = 0
-    with multiprocessing.Pool(processes=jobs) as pool:
+    with open(output_file, 'wb') as f_out, multiprocessing.Pool(processes=jobs) as pool:
         # Use imap_unordered to process results as they finish
-        for res, count, elapsed, result_data in pool.imap_unordered(worker_task, tasks):
+        for res, count, elapsed, error in pool.imap_unordered(worker_task, tasks):
             completed += 1
-            if isinstance(result_data, str):
+            part_file = tasks[res][5]
+            if error is not None:
                 # Error happened
-                print(f"[Slice {res}/{mod}] FAILED: {result_data}")
+                print(f"[Slice {res}/{mod}] FAILED: {error}")
             else:
-                all_graphs.extend(result_data)
+                if count:
+                    with open(part_file, 'rb') as f_part:
+                        shutil.copyfileobj(f_part, f_out)
+                total_graphs += count
                 stats.append((res, count, elapsed))
                 print(f"[Slice {res:>{len(str(mod))}}/{mod}] Finished in {elapsed:.2f}s | Found: {count} graphs | Progress: {completed}/{mod} ({(completed/mod)*100:.1f}%)")
+            # Never leave a part file behind, whatever happened to the slice
+            if os.path.exists(part_file):
+                os.remove(part_file)
 
     end_total = time.time()
     total_time = end_total - start_total
@@ -162,7 +174,7 @@ def main():
     print("GENERATION COMPLETE")
     print("=" * 40)
     print(f"Total time: {str(datetime.timedelta(seconds=total_time))}")
-    print(f"Total graphs found: {len(all_graphs)}")
+    print(f"Total graphs found: {total_graphs}")
     
     if stats:
         times = [s[2] for s in stats]
@@ -173,17 +185,10 @@ def main():
         print(f"Max time per slice: {max_time:.2f}s")
         print(f"Min time per slice: {min_time:.2f}s")
     
-    # Writing to file
-    if all_graphs:
-        print(f"\nWriting {len(all_graphs)} graphs to '{output_file}'...")
-        try:
-            with open(output_file, 'w') as f:
-                for g6 in all_graphs:
-                    f.write(g6 + "\n")
-            print("Done.")
-        except Exception as e:
-            print(f"Error writing to file: {e}")
+    if total_graphs:
+        print(f"\nWrote {total_graphs} graphs to '{output_file}'.")
     else:
+        os.remove(output_file)
         print("\nNo graphs found. File not created.")
 
 if __name__ == "__main__":